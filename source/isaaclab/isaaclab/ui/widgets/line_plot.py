@@ -156,21 +156,24 @@ class LiveLinePlot(UIWidgetWrapper):
             y_coords: A list of floats containing the y coordinates of the new data points.
         """
 
+        # resolve the filter once per batch: filters are only applied after the first sample,
+        # and the rendering dt does not change within a batch
+        filter_mode = self._filter_mode if self._last_values is not None else None
+        alpha = 0.8
+        one_minus_alpha = 1.0 - alpha
+        inv_rendering_dt = 1.0 / SimulationContext.instance().get_rendering_dt() if filter_mode == "Derivative" else 0.0
+
         for idx, y_coord in enumerate(y_coords):
 
             if len(self._y_data[idx]) > self._max_data_points:
                 self._y_data[idx] = self._y_data[idx][1:]
 
-            if self._filter_mode == "Lowpass":
-                if self._last_values is not None:
-                    alpha = 0.8
-                    y_coord = self._y_data[idx][-1] * alpha + y_coord * (1 - alpha)
-            elif self._filter_mode == "Integrate":
-                if self._last_values is not None:
-                    y_coord = self._y_data[idx][-1] + y_coord
-            elif self._filter_mode == "Derivative":
-                if self._last_values is not None:
-                    y_coord = (y_coord - self._last_values[idx]) / SimulationContext.instance().get_rendering_dt()
+            if filter_mode == "Lowpass":
+                y_coord = self._y_data[idx][-1] * alpha + y_coord * one_minus_alpha
+            elif filter_mode == "Integrate":
+                y_coord = self._y_data[idx][-1] + y_coord
+            elif filter_mode == "Derivative":
+                y_coord = (y_coord - self._last_values[idx]) * inv_rendering_dt
 
             self._y_data[idx].append(float(y_coord))
 
@@ -32,6 +32,10 @@ ISAAC_LAB_PATH = moonshot_utils.find_isaaclab_path().replace("\\","/")
 BASE_NAME: str = "leg4link4"
 WHEEL_ONLY_MODE: bool = False
 
+# shared parameters for the velocity-tracking reward terms
+# note: each term gets its own copy so the reward manager can resolve them independently
+_TRACK_REWARD_PARAMS = {"command_name": "body_velocity", "std": math.sqrt(0.01)}
+
 @configclass
 class HeroDragonRoughEnvCfg(LocomotionVelocityRoughEnvCfg):
     def __post_init__(self):
@@ -94,26 +98,26 @@ class HeroDragonRoughEnvCfg(LocomotionVelocityRoughEnvCfg):
 
         # rewards
         self.rewards.track_lin_vel_xy_exp = RewTerm(
-            func=mdp.track_lin_vel_xy_exp, 
-            weight=1.0, 
-            params= {
-                "command_name": "body_velocity",
-                "std": math.sqrt(0.01)
-            }
+            func=mdp.track_lin_vel_xy_exp,
+            weight=1.0,
+            params=dict(_TRACK_REWARD_PARAMS)
         )
         self.rewards.track_ang_vel_z_exp = RewTerm(
-            func=mdp.track_ang_vel_z_exp, 
-            weight=1.0, 
-            params= {
-                "command_name": "body_velocity",
-                "std": math.sqrt(0.01)
-            }
+            func=mdp.track_ang_vel_z_exp,
+            weight=1.0,
+            params=dict(_TRACK_REWARD_PARAMS)
         )
         self.rewards.dof_torques_l2.func = mdp.joint_torques_dragon_l2
         self.rewards.dof_torques_l2.weight = -1.0e-4
         self.rewards.dof_acc_l2.weight = -2.5e-7
         self.rewards.upright_wheel_bodies = None
 
+        # sensors
+        # only the leg links are consumed by the base-contact termination, so restrict the
+        # contact sensor to them instead of instantiating one per robot body
+        self.scene.contact_forces.prim_path = "{ENV_REGEX_NS}/Robot/leg4link.*"
+        self.scene.contact_forces.track_air_time = False
+
         # terminations
         self.terminations.base_contact.params["sensor_cfg"].body_names = "leg4link.*"
 
@@ -11,57 +11,23 @@ from . import agents
 # Register Gym environments.
 ##
 
-gym.register(
-    id="Moonshot-Velocity-Flat-Hero-Vehicle-v0",
-    entry_point="isaaclab.envs:ManagerBasedRLEnv",
-    disable_env_checker=True,
-    kwargs={
-        "env_cfg_entry_point": f"{__name__}.flat_env_cfg:HeroVehicleFlatEnvCfg",
-        "rsl_rl_cfg_entry_point": f"{agents.__name__}.rsl_rl_ppo_cfg:HeroVehicleFlatPPORunnerCfg",
-        "skrl_cfg_entry_point": f"{agents.__name__}:skrl_flat_ppo_cfg.yaml",
-    },
-)
-
-gym.register(
-    id="Moonshot-Velocity-Flat-Hero-Vehicle-Play-v0",
-    entry_point="isaaclab.envs:ManagerBasedRLEnv",
-    disable_env_checker=True,
-    kwargs={
-        "env_cfg_entry_point": f"{__name__}.flat_env_cfg:HeroVehicleFlatEnvCfg_PLAY",
-        "rsl_rl_cfg_entry_point": f"{agents.__name__}.rsl_rl_ppo_cfg:HeroVehicleFlatPPORunnerCfg",
-        "skrl_cfg_entry_point": f"{agents.__name__}:skrl_flat_ppo_cfg.yaml",
-    },
-)
-
-gym.register(
-    id="Moonshot-Velocity-Rough-Hero-Vehicle-v0",
-    entry_point="isaaclab.envs:ManagerBasedRLEnv",
-    disable_env_checker=True,
-    kwargs={
-        "env_cfg_entry_point": f"{__name__}.rough_env_cfg:HeroVehicleRoughEnvCfg",
-        "rsl_rl_cfg_entry_point": f"{agents.__name__}.rsl_rl_ppo_cfg:HeroVehicleRoughPPORunnerCfg",
-        "skrl_cfg_entry_point": f"{agents.__name__}:skrl_rough_ppo_cfg.yaml",
-    },
-)
-
-gym.register(
-    id="Moonshot-Velocity-Rough-Hero-Vehicle-Play-v0",
-    entry_point="isaaclab.envs:ManagerBasedRLEnv",
-    disable_env_checker=True,
-    kwargs={
-        "env_cfg_entry_point": f"{__name__}.rough_env_cfg:HeroVehicleRoughEnvCfg_PLAY",
-        "rsl_rl_cfg_entry_point": f"{agents.__name__}.rsl_rl_ppo_cfg:HeroVehicleRoughPPORunnerCfg",
-        "skrl_cfg_entry_point": f"{agents.__name__}:skrl_rough_ppo_cfg.yaml",
-    },
-)
-
-gym.register(
-    id="Moonshot-Velocity-Moon-Hero-Vehicle-Play-v0",
-    entry_point="isaaclab.envs:ManagerBasedRLEnv",
-    disable_env_checker=True,
-    kwargs={
-        "env_cfg_entry_point": f"{__name__}.rough_env_cfg:HeroVehicleMoonEnvCfg_PLAY",
-        "rsl_rl_cfg_entry_point": f"{agents.__name__}.rsl_rl_ppo_cfg:HeroVehicleRoughPPORunnerCfg",
-        "skrl_cfg_entry_point": f"{agents.__name__}:skrl_rough_ppo_cfg.yaml",
-    },
-)
+# (task id, env-config entry point, PPO runner config, skrl config file)
+_TASK_SPECS = [
+    ("Moonshot-Velocity-Flat-Hero-Vehicle-v0", "flat_env_cfg:HeroVehicleFlatEnvCfg", "HeroVehicleFlatPPORunnerCfg", "skrl_flat_ppo_cfg.yaml"),
+    ("Moonshot-Velocity-Flat-Hero-Vehicle-Play-v0", "flat_env_cfg:HeroVehicleFlatEnvCfg_PLAY", "HeroVehicleFlatPPORunnerCfg", "skrl_flat_ppo_cfg.yaml"),
+    ("Moonshot-Velocity-Rough-Hero-Vehicle-v0", "rough_env_cfg:HeroVehicleRoughEnvCfg", "HeroVehicleRoughPPORunnerCfg", "skrl_rough_ppo_cfg.yaml"),
+    ("Moonshot-Velocity-Rough-Hero-Vehicle-Play-v0", "rough_env_cfg:HeroVehicleRoughEnvCfg_PLAY", "HeroVehicleRoughPPORunnerCfg", "skrl_rough_ppo_cfg.yaml"),
+    ("Moonshot-Velocity-Moon-Hero-Vehicle-Play-v0", "rough_env_cfg:HeroVehicleMoonEnvCfg_PLAY", "HeroVehicleRoughPPORunnerCfg", "skrl_rough_ppo_cfg.yaml"),
+]
+
+for _task_id, _env_cfg, _ppo_runner, _skrl_cfg in _TASK_SPECS:
+    gym.register(
+        id=_task_id,
+        entry_point="isaaclab.envs:ManagerBasedRLEnv",
+        disable_env_checker=True,
+        kwargs={
+            "env_cfg_entry_point": f"{__name__}.{_env_cfg}",
+            "rsl_rl_cfg_entry_point": f"{agents.__name__}.rsl_rl_ppo_cfg:{_ppo_runner}",
+            "skrl_cfg_entry_point": f"{agents.__name__}:{_skrl_cfg}",
+        },
+    )
@@ -96,6 +96,12 @@ class HeroVehicleRoughEnvCfg(LocomotionVelocityRoughEnvCfg):
         self.rewards.track_ang_vel_z_exp.weight = 1.0
         self.rewards.dof_acc_l2.weight = -2.5e-7
 
+        # sensors
+        # only the leg links are consumed by the base-contact termination, so restrict the
+        # contact sensor to them instead of instantiating one per robot body
+        self.scene.contact_forces.prim_path = "{ENV_REGEX_NS}/Robot/leg1link.*"
+        self.scene.contact_forces.track_air_time = False
+
         # terminations
         self.terminations.base_contact.params["sensor_cfg"].body_names = "leg1link.*"
 
@@ -62,6 +62,21 @@ class UniformBodyVelocityCommandCfg(CommandTermCfg):
     This parameter is only used if :attr:`heading_command` is True.
     """
 
+    debug_vis_interval: int = 4
+    """Number of render callbacks between debug marker updates. Defaults to 4.
+
+    The markers are purely visual, so they do not need to be refreshed on every render tick.
+    Set to 1 to update the markers every tick.
+    """
+
+    metrics_update_interval: int = 1
+    """Number of environment steps between metric accumulation updates. Defaults to 1.
+
+    The tracking-error metrics are only consumed at logging cadence, so they can be accumulated
+    every N steps with each contribution scaled by N to keep the average equivalent. Set to 1 to
+    accumulate on every step.
+    """
+
     @configclass
     class Ranges:
         """Uniform distribution ranges for the velocity commands."""
@@ -16,6 +16,8 @@ from isaaclab.managers import CommandTerm
 from isaaclab.markers import VisualizationMarkers
 from isaaclab.utils.math import combine_frame_transforms, compute_pose_error, quat_from_euler_xyz, quat_unique
 
+import isaaclab_tasks.manager_based.moonshot.utils as moonshot_utils
+
 if TYPE_CHECKING:
     from isaaclab.envs import ManagerBasedEnv
 
@@ -56,7 +58,7 @@ class UniformPoseCommand(CommandTerm):
 
         # extract the robot and body index for which the command is generated
         self.robot: Articulation = env.scene[cfg.asset_name]
-        self.body_idx = self.robot.find_bodies(cfg.body_name)[0][0]
+        self.body_idx = moonshot_utils.find_body_index(self.robot, cfg.body_name)
 
         # create buffers
         # -- commands: (x, y, z, qw, qx, qy, qz) in root frame
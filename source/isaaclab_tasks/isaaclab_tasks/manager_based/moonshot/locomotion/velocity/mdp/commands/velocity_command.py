@@ -18,12 +18,126 @@ from isaaclab.assets import Articulation
 from isaaclab.managers import CommandTerm
 from isaaclab.markers import VisualizationMarkers
 
+import isaaclab_tasks.manager_based.moonshot.utils as moonshot_utils
+
 if TYPE_CHECKING:
     from isaaclab.envs import ManagerBasedEnv
 
     from .commands_cfg import UniformBodyVelocityCommandCfg
 
 
+@torch.jit.script
+def quaternion_to_yaw_torch(quat: torch.Tensor) -> torch.Tensor:
+    """Extract the yaw angle (rotation about z-axis) from a quaternion.
+
+    Args:
+        quat: The quaternion in (w, x, y, z) order. Shape is (..., 4).
+
+    Returns:
+        The yaw angle in radians. Shape is (...,).
+    """
+    w, x, y, z = quat.unbind(-1)
+    return torch.atan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z))
+
+
+@torch.jit.script
+def yaw_to_quaternion_torch(yaw: torch.Tensor) -> torch.Tensor:
+    """Build a quaternion for a pure rotation about the z-axis.
+
+    Equivalent to ``quat_from_euler_xyz(0, 0, yaw)`` without the roll/pitch trigonometry.
+
+    Args:
+        yaw: The yaw angle in radians. Shape is (...,).
+
+    Returns:
+        The quaternion in (w, x, y, z) order. Shape is (..., 4).
+    """
+    half = 0.5 * yaw
+    cos_half = torch.cos(half)
+    sin_half = torch.sin(half)
+    zeros = torch.zeros_like(cos_half)
+    return torch.stack([cos_half, zeros, zeros, sin_half], dim=-1)
+
+
+@torch.jit.script
+def heading_to_yaw_rate_torch(
+    heading_target: torch.Tensor,
+    quat_d: torch.Tensor,
+    stiffness: torch.Tensor,
+    ang_vel_min: torch.Tensor,
+    ang_vel_max: torch.Tensor,
+) -> torch.Tensor:
+    """Fused proportional heading controller.
+
+    Extracts the yaw from the desired-frame quaternion, wraps the heading error to
+    :math:`[-\\pi, \\pi)` and converts it to a clamped yaw-rate command in one scripted call.
+
+    Args:
+        heading_target: The target heading angles in radians. Shape is (N,).
+        quat_d: The desired-frame quaternions in (w, x, y, z) order. Shape is (N, 4).
+        stiffness: The proportional gain on the heading error. Scalar tensor.
+        ang_vel_min: Lower clamp bound for the yaw-rate command. Scalar tensor.
+        ang_vel_max: Upper clamp bound for the yaw-rate command. Scalar tensor.
+
+    Returns:
+        The yaw-rate commands. Shape is (N,).
+    """
+    yaw = quaternion_to_yaw_torch(quat_d)
+    # branchless wrap to [-pi, pi): atan2 of the sine/cosine pair is fully vectorized and
+    # fuses with the surrounding pointwise ops
+    diff = heading_target - yaw
+    heading_error = torch.atan2(torch.sin(diff), torch.cos(diff))
+    return torch.clamp(stiffness * heading_error, ang_vel_min, ang_vel_max)
+
+
+@torch.jit.script
+def accumulate_velocity_errors_torch(
+    error_vel_xy: torch.Tensor,
+    error_vel_yaw: torch.Tensor,
+    command: torch.Tensor,
+    lin_vel_d: torch.Tensor,
+    ang_vel_z: torch.Tensor,
+    inv_max_command_step: float,
+) -> None:
+    """Accumulate the scaled velocity-tracking errors into the metric buffers in-place.
+
+    Scripted so the subtract/norm/abs/scale/accumulate chain fuses into as few kernels as
+    possible instead of materializing a temporary per operation.
+
+    Args:
+        error_vel_xy: Accumulated linear-velocity error metric. Shape is (num_envs,).
+        error_vel_yaw: Accumulated yaw-rate error metric. Shape is (num_envs,).
+        command: The velocity command. Shape is (num_envs, 3).
+        lin_vel_d: The body linear velocity in the desired frame. Shape is (num_envs, 3).
+        ang_vel_z: The body yaw rate in the world frame. Shape is (num_envs,).
+        inv_max_command_step: Scale applied to each accumulated contribution.
+    """
+    error_vel_xy += torch.norm(command[:, :2] - lin_vel_d[:, :2], dim=-1) * inv_max_command_step
+    error_vel_yaw += torch.abs(command[:, 2] - ang_vel_z) * inv_max_command_step
+
+
+@torch.jit.script
+def quat_mul_yaw_torch(q: torch.Tensor, yaw_quat: torch.Tensor) -> torch.Tensor:
+    """Multiply a quaternion with a pure-yaw quaternion, i.e. ``q x (w2, 0, 0, z2)``.
+
+    Specialization of the Hamilton product that drops the terms multiplying the zero
+    x/y components of the yaw quaternion (8 multiplies instead of 16).
+
+    Args:
+        q: The left quaternion in (w, x, y, z) order. Shape is (..., 4).
+        yaw_quat: The pure-yaw right quaternion in (w, 0, 0, z) order. Shape is (..., 4).
+
+    Returns:
+        The product quaternion in (w, x, y, z) order. Shape is (..., 4).
+    """
+    w1, x1, y1, z1 = q.unbind(-1)
+    w2 = yaw_quat[..., 0]
+    z2 = yaw_quat[..., 3]
+    return torch.stack(
+        [w1 * w2 - z1 * z2, x1 * w2 + y1 * z2, y1 * w2 - x1 * z2, w1 * z2 + z1 * w2], dim=-1
+    )
+
+
 class UniformBodyVelocityCommand(CommandTerm):
     r"""Command generator that generates a velocity command in SE(2) from uniform distribution.
 
@@ -45,6 +159,26 @@ class UniformBodyVelocityCommand(CommandTerm):
     cfg: UniformBodyVelocityCommandCfg
     """The configuration of the command generator."""
 
+    _TF_D_MATRICES = {
+        "leg1link2": [[-1.0, 0.0, 0.0], [0.0, 0.0, 1.0], [0.0, 1.0, 0.0]],
+        "leg1link4": [[0.0, 0.0, -1.0], [-1.0, 0.0, 0.0], [0.0, 1.0, 0.0]],
+    }
+    """Rotation matrices from the body link frame to the desired frame, keyed by body name."""
+
+    _debug_vis_enabled = False
+    """Mirrors the marker visibility so the callback can skip all work when hidden.
+
+    Declared on the class since :meth:`_set_debug_vis_impl` owns this state and already runs
+    from the base-class constructor, before the ``__init__`` body of this class.
+    """
+
+    _marker_pos = None
+    """Persistent buffer for the marker positions (body position with a z-offset).
+
+    Allocated by :meth:`_set_debug_vis_impl` together with the markers; declared on the class
+    for the same constructor-ordering reason as :attr:`_debug_vis_enabled`.
+    """
+
     def __init__(self, cfg: UniformBodyVelocityCommandCfg, env: ManagerBasedEnv):
         """Initialize the command generator.
 
@@ -76,12 +210,69 @@ class UniformBodyVelocityCommand(CommandTerm):
         
         # crete buffers to store the command
         # -- command: x vel, y vel, yaw vel, heading
-        self.vel_command_b = torch.zeros(self.num_envs, 3, device=self.device)
-        self.heading_target = torch.zeros(self.num_envs, device=self.device)
-        self.is_heading_env = torch.zeros(self.num_envs, dtype=torch.bool, device=self.device)
-        self.is_standing_env = torch.zeros_like(self.is_heading_env)
-        self.body_link_idx = self.robot.find_bodies(cfg.body_name)[0][0]
+        # note: buffers are pinned to float32 so no op in the pipeline silently promotes them
+        self.vel_command_b = torch.zeros(self.num_envs, 3, dtype=torch.float32, device=self.device)
+        # the heading-target buffer is only consumed by the heading controller, so it is not
+        # allocated when the heading command is disabled
+        if cfg.heading_command:
+            self.heading_target = torch.zeros(self.num_envs, dtype=torch.float32, device=self.device)
+        else:
+            self.heading_target = None
+        # per-env flags packed into one byte buffer: bit 0 = heading env, bit 1 = standing env
+        self._env_flags = torch.zeros(self.num_envs, dtype=torch.uint8, device=self.device)
+        # env-id lists per category, rebuilt once per resample so the per-step command update
+        # does not have to compact the flag masks (masked indexing runs a nonzero internally)
+        self._heading_env_ids = torch.empty(0, dtype=torch.long, device=self.device)
+        self._standing_env_ids = torch.empty(0, dtype=torch.long, device=self.device)
+        self.body_link_idx = moonshot_utils.find_body_index(self.robot, cfg.body_name)
+        # -- constant world-to-desired frame transform quaternion for the body link
+        # note: this depends only on the body name, so it is resolved once here instead of
+        # rebuilding the rotation matrix on every call
+        tf_d_matrix = self._TF_D_MATRICES.get(cfg.body_name)
+        if tf_d_matrix is None:
+            raise ValueError(f"Unexpected link name: {cfg.body_name}")
+        self._tf_d_quat = math_utils.quat_from_matrix(torch.tensor([tf_d_matrix], device=self.device))
+        # both known frame matrices are signed axis permutations, so rotating a vector into
+        # the desired frame (v_d = R^T v) reduces to a component gather plus sign flips
+        tf_d_matrix_t = torch.tensor(tf_d_matrix, device=self.device).t()
+        self._tf_d_perm = tf_d_matrix_t.abs().argmax(dim=1)
+        self._tf_d_sign = tf_d_matrix_t.gather(1, self._tf_d_perm.unsqueeze(1)).squeeze(1)
+        # -- sampling bounds: one row per sampled quantity so that a single batched uniform draw
+        #    can be scaled into all the command channels at once
+        #    columns: lin_vel_x, lin_vel_y, ang_vel_z, heading
+        heading_range = cfg.ranges.heading if cfg.ranges.heading is not None else (0.0, 0.0)
+        sample_ranges = (cfg.ranges.lin_vel_x, cfg.ranges.lin_vel_y, cfg.ranges.ang_vel_z, heading_range)
+        self._sample_lo = torch.tensor([r[0] for r in sample_ranges], dtype=torch.float32, device=self.device)
+        self._sample_scale = torch.tensor([r[1] - r[0] for r in sample_ranges], dtype=torch.float32, device=self.device)
+        # scratch buffer for the resample draws, sized for a full-scene reset and sliced per call
+        self._sample_scratch = torch.empty(self.num_envs, 6, dtype=torch.float32, device=self.device)
+        # -- heading controller constants (device tensors so torch does not re-wrap them every step)
+        self._ang_vel_z_min = torch.tensor(cfg.ranges.ang_vel_z[0], device=self.device)
+        self._ang_vel_z_max = torch.tensor(cfg.ranges.ang_vel_z[1], device=self.device)
+        self._heading_stiffness = torch.tensor(cfg.heading_control_stiffness, device=self.device)
+        # -- per-step cache of the body-link state slices (refreshed in :meth:`_refresh_body_state_cache`)
+        self._body_quat_w = None
+        self._body_lin_vel_w = None
+        self._body_ang_vel_w = None
+        # -- per-step memo of derived quantities (invalidated when the state cache refreshes)
+        self._cached_state_step = -1
+        self._cached_quat_w_d = None
+        self._cached_lin_vel_d = None
+        # -- cached goal-arrow visualization (base frame), rebuilt only when the command changes
+        self._goal_arrow_scale = None
+        self._goal_arrow_quat_b = None
+        self._goal_arrow_stale = True
+        # -- default arrow scale constants (resolved lazily once the visualizers exist)
+        self._default_arrow_scale = None
+        self._arrow_scale_x = 1.0
+        # -- render tick counter used to throttle the debug visualization
+        self._vis_tick = 0
         # -- metrics
+        # time for which the command was executed (resampling range is static, so precompute once)
+        # note: when the metric accumulation is decimated, each contribution is scaled by the
+        # interval so the accumulated average stays equivalent
+        max_command_step = self.cfg.resampling_time_range[1] / self._env.step_dt
+        self._inv_max_command_step = self.cfg.metrics_update_interval / max_command_step
         self.metrics["error_vel_xy"] = torch.zeros(self.num_envs, device=self.device)
         self.metrics["error_vel_yaw"] = torch.zeros(self.num_envs, device=self.device)
 
@@ -109,81 +300,92 @@ class UniformBodyVelocityCommand(CommandTerm):
     Implementation specific functions.
     """
 
+    def _refresh_body_state_cache(self):
+        """Cache the body-link state slices as contiguous tensors.
+
+        The same body slice is consumed several times per step (metrics, command update and
+        debug visualization). Caching it once avoids repeated strided gathers from the full
+        body-state buffers. The refresh is skipped when the env step counter has not advanced,
+        which also keeps the derived-quantity memos below valid across the step.
+        """
+        step = self._env.common_step_counter
+        if step == self._cached_state_step:
+            return
+        self._body_quat_w = self.robot.data.body_quat_w[:, self.body_link_idx, :].contiguous()
+        self._body_lin_vel_w = self.robot.data.body_lin_vel_w[:, self.body_link_idx, :].contiguous()
+        self._body_ang_vel_w = self.robot.data.body_ang_vel_w[:, self.body_link_idx, :].contiguous()
+        self._cached_state_step = step
+        self._cached_quat_w_d = None
+        self._cached_lin_vel_d = None
+
     def _get_body_vel_d(self, body_vel_w):
         # calculates velocity of body in desired (d) frame (x = forwards, y = left, z = up)
-        body_quat_w = self.robot.data.body_quat_w[:, self.body_link_idx, :]
-        if self.cfg.body_name == "leg1link2":
-            tf_d_matrix = torch.tensor([[-1,0,0],[0,0,1],[0,1,0]], device = self.device)
-            tf_d_matrix_expanded = tf_d_matrix.unsqueeze(0).expand(self.num_envs, -1, -1)
-            tf_d_quat = math_utils.quat_from_matrix(tf_d_matrix_expanded)
-        elif self.cfg.body_name == "leg1link4":
-            tf_d_matrix = torch.tensor([[0,0,-1],[-1,0,0],[0,1,0]], device = self.device)
-            tf_d_matrix_expanded = tf_d_matrix.unsqueeze(0).expand(self.num_envs, -1, -1)
-            tf_d_quat = math_utils.quat_from_matrix(tf_d_matrix_expanded)      
-        else:
-            raise ValueError(f"Unexpected link name: {self.cfg.body_name}")
-        
-        quat_w_d = math_utils.quat_mul(body_quat_w, tf_d_quat)
-        
-        body_vel_d = math_utils.quat_rotate_inverse(
-            quat_w_d, body_vel_w
-        )
-
+        # note: the composed rotation is applied in two stages (link frame first, then the
+        # constant desired-frame rotation), so the velocity path does not need the composed
+        # quaternion from :meth:`_get_body_quat_d`
+        # memoize the rotated linear velocity: it is consumed by both the metrics and the
+        # debug visualization within the same step
+        if body_vel_w is self._body_lin_vel_w and self._cached_lin_vel_d is not None:
+            return self._cached_lin_vel_d
+        body_vel_link = math_utils.quat_rotate_inverse(self._body_quat_w, body_vel_w)
+        # the desired-frame rotation is a signed axis permutation: gather + sign flips
+        # instead of a full quaternion rotation
+        body_vel_d = body_vel_link.index_select(1, self._tf_d_perm) * self._tf_d_sign
+        if body_vel_w is self._body_lin_vel_w:
+            self._cached_lin_vel_d = body_vel_d
         return body_vel_d
 
     def _get_body_quat_d(self):
         # calculates quat from world (w) to desired (d) frame
-        body_quat_w = self.robot.data.body_quat_w[:, self.body_link_idx, :]
-        
-        if self.cfg.body_name == "leg1link2":
-            tf_d_matrix = torch.tensor([[-1,0,0],[0,0,1],[0,1,0]], device = self.device)
-            tf_d_matrix_expanded = tf_d_matrix.unsqueeze(0).expand(self.num_envs, -1, -1)
-            tf_d_quat = math_utils.quat_from_matrix(tf_d_matrix_expanded)
-        elif self.cfg.body_name == "leg1link4":
-            tf_d_matrix = torch.tensor([[0,0,-1],[-1,0,0],[0,1,0]], device = self.device)
-            tf_d_matrix_expanded = tf_d_matrix.unsqueeze(0).expand(self.num_envs, -1, -1)
-            tf_d_quat = math_utils.quat_from_matrix(tf_d_matrix_expanded)
-        else:
-            raise ValueError(f"Unexpected link name: {self.cfg.body_name}")
-        
-        quat_w_d = math_utils.quat_mul(body_quat_w, tf_d_quat)
-
-        return quat_w_d
+        # note: the frame transform quaternion is constant and resolved once in __init__, and
+        # the product is memoized per step (metrics, heading controller and debug vis share it)
+        if self._cached_quat_w_d is None:
+            self._cached_quat_w_d = math_utils.quat_mul(
+                self._body_quat_w, self._tf_d_quat.expand(self.num_envs, -1)
+            )
+        return self._cached_quat_w_d
 
     def _update_metrics(self):
-        # time for which the command was executed
-        max_command_time = self.cfg.resampling_time_range[1]
-        max_command_step = max_command_time / self._env.step_dt
+        # metrics are only consumed at logging cadence, so the accumulation can be decimated
+        if self._env.common_step_counter % self.cfg.metrics_update_interval:
+            return
+        # refresh the per-step body state cache
+        self._refresh_body_state_cache()
         # logs data
-        body_lin_vel_d = self._get_body_vel_d(self.robot.data.body_lin_vel_w[:, self.body_link_idx, :])
-
-        self.metrics["error_vel_xy"] += (
-            torch.norm(self.vel_command_b[:, :2] - body_lin_vel_d[:, :2], dim=-1) / max_command_step
-        )
-        # self.metrics["error_vel_yaw"] += (
-        #     torch.abs(self.vel_command_b[:, 2] - body_ang_vel_d[:, 2]) / max_command_step
-        # )
-        self.metrics["error_vel_yaw"] += (
-            torch.abs(self.vel_command_b[:, 2] - self.robot.data.body_ang_vel_w[:, self.body_link_idx, 2]) / max_command_step
+        body_lin_vel_d = self._get_body_vel_d(self._body_lin_vel_w)
+
+        accumulate_velocity_errors_torch(
+            self.metrics["error_vel_xy"],
+            self.metrics["error_vel_yaw"],
+            self.vel_command_b,
+            body_lin_vel_d,
+            self._body_ang_vel_w[:, 2],
+            self._inv_max_command_step,
         )
 
     def _resample_command(self, env_ids: Sequence[int]):
-        # sample velocity commands
-        r = torch.empty(len(env_ids), device=self.device)
-        # -- linear velocity - x direction
-        self.vel_command_b[env_ids, 0] = r.uniform_(*self.cfg.ranges.lin_vel_x)
-        # -- linear velocity - y direction
-        self.vel_command_b[env_ids, 1] = r.uniform_(*self.cfg.ranges.lin_vel_y)
-        # -- ang vel yaw - rotation around z
-        self.vel_command_b[env_ids, 2] = r.uniform_(*self.cfg.ranges.ang_vel_z)
-
+        # sample all random numbers for this resample in one batched draw into the persistent scratch
+        # columns: lin_vel_x, lin_vel_y, ang_vel_z, heading, heading bernoulli, standing bernoulli
+        u = self._sample_scratch[: len(env_ids)].uniform_(0.0, 1.0)
+        samples = self._sample_lo + self._sample_scale * u[:, :4]
+        # -- write lin_vel_x, lin_vel_y and ang_vel_z in one coalesced row scatter
+        self.vel_command_b[env_ids] = samples[:, :3]
+
+        # update standing envs (bit 1 of the packed flags)
+        flags = (u[:, 5] <= self.cfg.rel_standing_envs).to(torch.uint8) << 1
         # heading target
         if self.cfg.heading_command:
-            self.heading_target[env_ids] = r.uniform_(*self.cfg.ranges.heading)
-            # update heading envs
-            self.is_heading_env[env_ids] = r.uniform_(0.0, 1.0) <= self.cfg.rel_heading_envs
-        # update standing envs
-        self.is_standing_env[env_ids] = r.uniform_(0.0, 1.0) <= self.cfg.rel_standing_envs
+            self.heading_target[env_ids] = samples[:, 3]
+            # update heading envs (bit 0 of the packed flags)
+            flags |= (u[:, 4] <= self.cfg.rel_heading_envs).to(torch.uint8)
+        self._env_flags[env_ids] = flags
+        # rebuild the per-category env-id lists (one compaction per resample instead of one
+        # masked-indexing nonzero per step)
+        if self.cfg.heading_command:
+            self._heading_env_ids = (self._env_flags & 1).nonzero(as_tuple=True)[0]
+        self._standing_env_ids = (self._env_flags & 2).nonzero(as_tuple=True)[0]
+        # the goal-arrow visualization has to be rebuilt for the new commands
+        self._goal_arrow_stale = True
 
     def _update_command(self):
         """Post-processes the velocity command.
@@ -193,23 +395,32 @@ class UniformBodyVelocityCommand(CommandTerm):
         """
         # Compute angular velocity from heading direction
         if self.cfg.heading_command:
-            # resolve indices of heading envs
-            env_ids = self.is_heading_env.nonzero(as_tuple=False).flatten()
-            # compute angular velocity
-            heading_error = math_utils.wrap_to_pi(self.heading_target[env_ids] - math_utils.euler_xyz_from_quat(self._get_body_quat_d())[2][env_ids])
-            self.vel_command_b[env_ids, 2] = torch.clip(
-                self.cfg.heading_control_stiffness * heading_error,
-                min=self.cfg.ranges.ang_vel_z[0],
-                max=self.cfg.ranges.ang_vel_z[1],
+            # the heading controller needs the current body orientation even on steps where
+            # the metric accumulation was skipped (a no-op when the cache is already fresh)
+            self._refresh_body_state_cache()
+            # the heading env ids are compacted once per resample, so the controller only
+            # gathers the envs it actually drives
+            env_ids = self._heading_env_ids
+            # compute angular velocity with the fused scripted controller (yaw extraction,
+            # error wrapping, gain and clamp in one call)
+            self.vel_command_b[env_ids, 2] = heading_to_yaw_rate_torch(
+                self.heading_target.index_select(0, env_ids),
+                self._get_body_quat_d().index_select(0, env_ids),
+                self._heading_stiffness,
+                self._ang_vel_z_min,
+                self._ang_vel_z_max,
             )
+            # the heading controller rewrites the yaw command every step
+            self._goal_arrow_stale = True
         # Enforce standing (i.e., zero velocity command) for standing envs
-        # TODO: check if conversion is needed
-        standing_env_ids = self.is_standing_env.nonzero(as_tuple=False).flatten()
-        self.vel_command_b[standing_env_ids, :] = 0.0
+        # note: index_fill_ dispatches as a single in-place kernel, unlike the broadcasting
+        # index_put_ behind a slice assignment
+        self.vel_command_b.index_fill_(0, self._standing_env_ids, 0.0)
 
     def _set_debug_vis_impl(self, debug_vis: bool):
         # set visibility of markers
         # note: parent only deals with callbacks. not their visibility
+        self._debug_vis_enabled = debug_vis
         if debug_vis:
             # create markers if necessary for the first tome
             if not hasattr(self, "goal_vel_visualizer"):
@@ -217,6 +428,10 @@ class UniformBodyVelocityCommand(CommandTerm):
                 self.goal_vel_visualizer = VisualizationMarkers(self.cfg.goal_vel_visualizer_cfg)
                 # -- current
                 self.current_vel_visualizer = VisualizationMarkers(self.cfg.current_vel_visualizer_cfg)
+            # -- marker-position buffer, only needed once the markers exist (guarded on the
+            #    buffer itself so visibility toggles cannot leave it unallocated)
+            if self._marker_pos is None:
+                self._marker_pos = torch.empty(self.num_envs, 3, device=self.device)
             # set their visibility to true
             self.goal_vel_visualizer.set_visibility(True)
             self.current_vel_visualizer.set_visibility(True)
@@ -226,38 +441,59 @@ class UniformBodyVelocityCommand(CommandTerm):
                 self.current_vel_visualizer.set_visibility(False)
 
     def _debug_vis_callback(self, event):
+        # skip all marker work while the visualization is toggled off
+        if not self._debug_vis_enabled:
+            return
+        # only refresh the markers every cfg.debug_vis_interval render ticks
+        self._vis_tick += 1
+        if self._vis_tick % self.cfg.debug_vis_interval:
+            return
         # check if robot is initialized
         # note: this is needed in-case the robot is de-initialized. we can't access the data
         if not self.robot.is_initialized:
             return
+        # refresh the per-step body state cache (render callbacks run outside the step loop)
+        self._refresh_body_state_cache()
         # get marker location
-        # -- base state
-        body_pos_w = self.robot.data.body_pos_w[:,self.body_link_idx,:].clone()
-        body_pos_w[:, 2] += 0.5
-        # -- resolve the scales and quaternions
-        vel_des_arrow_scale, vel_des_arrow_quat = self._resolve_xy_velocity_to_arrow(self.command[:, :2])
-        vel_arrow_scale, vel_arrow_quat = self._resolve_xy_velocity_to_arrow(self._get_body_vel_d(self.robot.data.body_lin_vel_w[:, self.body_link_idx, :])[:, :2])
+        # -- base state (written into the persistent buffer to avoid a fresh clone every frame)
+        self._marker_pos.copy_(self.robot.data.body_pos_w[:, self.body_link_idx, :])
+        self._marker_pos[:, 2].add_(0.5)
+        # -- resolve the scales and quaternions (in the desired body frame)
+        # note: the goal arrow only changes when the command does, so it is cached across frames
+        if self._goal_arrow_stale:
+            self._goal_arrow_scale, self._goal_arrow_quat_b = self._resolve_xy_velocity_to_arrow(self.command[:, :2])
+            self._goal_arrow_stale = False
+        vel_des_arrow_scale = self._goal_arrow_scale
+        # the desired-frame quaternion is memoized per step, so the arrow rotation below
+        # shares it with the heading controller
+        body_quat_d = self._get_body_quat_d()
+        vel_arrow_scale, vel_arrow_quat_b = self._resolve_xy_velocity_to_arrow(
+            self._get_body_vel_d(self._body_lin_vel_w)[:, :2]
+        )
+        # -- convert both arrows from the desired body frame to the world frame in one batched rotation
+        # note: the base-frame arrow quaternions are pure-yaw, so the specialized product applies
+        arrow_quat_b = torch.cat([self._goal_arrow_quat_b, vel_arrow_quat_b], dim=0)
+        arrow_quat_w = quat_mul_yaw_torch(body_quat_d.repeat(2, 1), arrow_quat_b)
+        vel_des_arrow_quat, vel_arrow_quat = arrow_quat_w.chunk(2, dim=0)
         # display markers
-        self.goal_vel_visualizer.visualize(body_pos_w, vel_des_arrow_quat, vel_des_arrow_scale)
-        self.current_vel_visualizer.visualize(body_pos_w, vel_arrow_quat, vel_arrow_scale)
+        self.goal_vel_visualizer.visualize(self._marker_pos, vel_des_arrow_quat, vel_des_arrow_scale)
+        self.current_vel_visualizer.visualize(self._marker_pos, vel_arrow_quat, vel_arrow_scale)
 
     """
     Internal helpers.
     """
 
     def _resolve_xy_velocity_to_arrow(self, xy_velocity: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
-        """Converts the XY base velocity command to arrow direction rotation."""
-        # obtain default scale of the marker
-        default_scale = self.goal_vel_visualizer.cfg.markers["arrow"].scale
-        # arrow-scale
-        arrow_scale = torch.tensor(default_scale, device=self.device).repeat(xy_velocity.shape[0], 1)
-        arrow_scale[:, 0] *= torch.linalg.norm(xy_velocity, dim=1) * 3.0
+        """Converts the XY base velocity command to arrow scale and direction rotation (base frame)."""
+        # obtain default scale of the marker (uploaded to the device once)
+        if self._default_arrow_scale is None:
+            default_scale = self.goal_vel_visualizer.cfg.markers["arrow"].scale
+            self._default_arrow_scale = torch.tensor(default_scale, device=self.device)
+            self._arrow_scale_x = 3.0 * default_scale[0]
+        # arrow-scale: the x-column is the velocity magnitude scaled by the default length
+        arrow_scale = self._default_arrow_scale.repeat(xy_velocity.shape[0], 1)
+        arrow_scale[:, 0] = torch.linalg.norm(xy_velocity, dim=1) * self._arrow_scale_x
         # arrow-direction
         heading_angle = torch.atan2(xy_velocity[:, 1], xy_velocity[:, 0])
-        zeros = torch.zeros_like(heading_angle)
-        arrow_quat = math_utils.quat_from_euler_xyz(zeros, zeros, heading_angle)
-        # convert everything back from base to world frame
-        body_quat_d = self._get_body_quat_d()
-        # body_quat_w = self.robot.data.body_quat_w[:, self.body_link_idx, :]
-        arrow_quat = math_utils.quat_mul(body_quat_d, arrow_quat)
+        arrow_quat = yaw_to_quaternion_torch(heading_angle)
         return arrow_scale, arrow_quat
\ No newline at end of file
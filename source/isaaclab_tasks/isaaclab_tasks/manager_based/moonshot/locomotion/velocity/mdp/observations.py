@@ -12,6 +12,8 @@ import isaaclab.utils.math as math_utils
 from isaaclab.assets import Articulation
 from isaaclab.managers import SceneEntityCfg
 
+import isaaclab_tasks.manager_based.moonshot.utils as moonshot_utils
+
 if TYPE_CHECKING:
     from isaaclab.envs import ManagerBasedEnv
 
@@ -78,7 +80,7 @@ def body_pos_z(env: ManagerBasedEnv, body_name: str, asset_cfg: SceneEntityCfg =
     """Root height in the simulation world frame."""
     # extract the used quantities (to enable type-hinting)
     asset: Articulation = env.scene[asset_cfg.name]
-    body_link_idx = asset.find_bodies(body_name)[0][0]
+    body_link_idx = moonshot_utils.find_body_index(asset, body_name)
     return asset.data.body_pos_w[:,body_link_idx ,2].unsqueeze(-1)
 
 
@@ -86,7 +88,7 @@ def body_lin_vel(env: ManagerBasedEnv, body_name: str, asset_cfg: SceneEntityCfg
     """Root linear velocity in the asset's root frame."""
     # extract the used quantities (to enable type-hinting)
     asset: Articulation = env.scene[asset_cfg.name]
-    body_link_idx = asset.find_bodies(body_name)[0][0]
+    body_link_idx = moonshot_utils.find_body_index(asset, body_name)
     return asset.data.body_lin_vel_w[:, body_link_idx, :]
 
 
@@ -94,5 +96,5 @@ def body_ang_vel(env: ManagerBasedEnv, body_name: str, asset_cfg: SceneEntityCfg
     """Root angular velocity in the asset's root frame."""
     # extract the used quantities (to enable type-hinting)
     asset: Articulation = env.scene[asset_cfg.name]
-    body_link_idx = asset.find_bodies(body_name)[0][0]
+    body_link_idx = moonshot_utils.find_body_index(asset, body_name)
     return asset.data.body_ang_vel_w[:, body_link_idx ,:]
\ No newline at end of file
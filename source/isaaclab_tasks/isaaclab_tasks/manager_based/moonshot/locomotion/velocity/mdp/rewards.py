@@ -14,12 +14,53 @@ from isaaclab.assets import Articulation, RigidObject
 from isaaclab.managers import ManagerTermBase, RewardTermCfg, SceneEntityCfg
 from isaaclab.sensors import ContactSensor, RayCaster
 
+import isaaclab_tasks.manager_based.moonshot.utils as moonshot_utils
+
 from . import observations as obs
 
 if TYPE_CHECKING:
     from isaaclab.envs import ManagerBasedRLEnv
 
 
+# rotation from the body frame to the desired command frame for the supported base links
+_TF_D_MATRICES = {
+    "leg1link2": [[-1, 0, 0], [0, 0, 1], [0, 1, 0]],
+    "leg1link4": [[0, 0, -1], [-1, 0, 0], [0, 1, 0]],
+}
+# cache of the corresponding quaternions, keyed on (body name, device)
+_tf_d_quat_cache: dict = {}
+
+
+def _tf_d_quat(body_name: str, device: torch.device) -> torch.Tensor:
+    """Quaternion from the body frame to the desired command frame. Shape is (1, 4).
+
+    The quaternion is a constant per body name, so it is built once per device and cached instead
+    of re-uploading the rotation matrix and converting it on every reward call.
+    """
+    key = (body_name, str(device))
+    quat = _tf_d_quat_cache.get(key)
+    if quat is None:
+        if body_name not in _TF_D_MATRICES:
+            raise ValueError(f"Unexpected link name: {body_name}")
+        tf_d_matrix = torch.tensor(_TF_D_MATRICES[body_name], dtype=torch.float, device=device)
+        quat = math_utils.quat_from_matrix(tf_d_matrix.unsqueeze(0))
+        _tf_d_quat_cache[key] = quat
+    return quat
+
+
+@torch.jit.script
+def _track_lin_vel_xy_exp(command: torch.Tensor, lin_vel: torch.Tensor, std: float) -> torch.Tensor:
+    """Exponential kernel of the xy linear-velocity tracking error, fused into one scripted call."""
+    lin_vel_error = torch.sum(torch.square(command[:, :2] - lin_vel[:, :2]), dim=1)
+    return torch.exp(-lin_vel_error / (std * std))
+
+
+@torch.jit.script
+def _track_ang_vel_z_exp(command_z: torch.Tensor, ang_vel_z: torch.Tensor, std: float) -> torch.Tensor:
+    """Exponential kernel of the yaw-rate tracking error, fused into one scripted call."""
+    return torch.exp(-torch.square(command_z - ang_vel_z) / (std * std))
+
+
 def upright_posture_bonus(
     env: ManagerBasedRLEnv, threshold: float, asset_cfg: SceneEntityCfg = SceneEntityCfg("robot")
 ) -> torch.Tensor:
@@ -158,8 +199,9 @@ def track_ang_vel_z_world_exp(
     """Reward tracking of angular velocity commands (yaw) in world frame using exponential kernel."""
     # extract the used quantities (to enable type-hinting)
     asset = env.scene[asset_cfg.name]
-    ang_vel_error = torch.square(env.command_manager.get_command(command_name)[:, 2] - asset.data.root_ang_vel_w[:, 2])
-    return torch.exp(-ang_vel_error / std**2)
+    return _track_ang_vel_z_exp(
+        env.command_manager.get_command(command_name)[:, 2], asset.data.root_ang_vel_w[:, 2], std
+    )
 
 def joint_deviation_vehicle_l1(env: ManagerBasedRLEnv, asset_cfg: SceneEntityCfg = SceneEntityCfg("robot")) -> torch.Tensor:
     """Penalize joint positions that deviate from the default one."""
@@ -168,7 +210,7 @@ def joint_deviation_vehicle_l1(env: ManagerBasedRLEnv, asset_cfg: SceneEntityCfg
     # do not include the grippers revolute joints
     # joint_names = [f"leg1joint{i}" for i in range(2,7)]
     joint_names = [f"leg1joint{i}" for i in [2,6]]  
-    leg_joint_idx = [asset.find_joints(name)[0][0] for name in joint_names]
+    leg_joint_idx = [moonshot_utils.find_joint_index(asset, name) for name in joint_names]
     vehicle_cfg_angles = asset.data.default_joint_pos[:, asset_cfg.joint_ids]
     
     vehicle_cfg_angles[:, leg_joint_idx[0]] = 0
@@ -190,7 +232,7 @@ def joint_deviation_vehicle_l2(env: ManagerBasedRLEnv, asset_cfg: SceneEntityCfg
     asset: Articulation = env.scene[asset_cfg.name]
     # do not include the grippers revolute joints
     joint_names = [f"leg1joint{i}" for i in range(4,5)] 
-    leg_joint_idx = [asset.find_joints(name)[0][0] for name in joint_names]
+    leg_joint_idx = [moonshot_utils.find_joint_index(asset, name) for name in joint_names]
     vehicle_cfg_angles = asset.data.default_joint_pos[:, asset_cfg.joint_ids]
     
     vehicle_cfg_angles[:, leg_joint_idx[0]] = 0
@@ -213,7 +255,7 @@ def wheel_vel_deviation_front(env: ManagerBasedRLEnv, asset_cfg: SceneEntityCfg
     asset: Articulation = env.scene[asset_cfg.name]
     
     wheel_joint_names = ["wheel11_left_joint","wheel11_right_joint"] 
-    wheel_joint_idx =  [asset.find_joints(name)[0][0] for name in wheel_joint_names]
+    wheel_joint_idx =  [moonshot_utils.find_joint_index(asset, name) for name in wheel_joint_names]
     wheel_joint_vel = asset.data.joint_vel[:, asset_cfg.joint_ids][:, wheel_joint_idx]
 
     # pairwise wheel velocity diff
@@ -230,7 +272,7 @@ def wheel_vel_deviation_rear(env: ManagerBasedRLEnv, asset_cfg: SceneEntityCfg =
     asset: Articulation = env.scene[asset_cfg.name]
     
     wheel_joint_names = ["wheel12_left_joint","wheel12_right_joint"] 
-    wheel_joint_idx =  [asset.find_joints(name)[0][0] for name in wheel_joint_names]
+    wheel_joint_idx =  [moonshot_utils.find_joint_index(asset, name) for name in wheel_joint_names]
     wheel_joint_vel = asset.data.joint_vel[:, asset_cfg.joint_ids][:, wheel_joint_idx]
 
     # pairwise wheel velocity diff
@@ -248,19 +290,10 @@ def track_lin_vel_xy_exp_vehicle(
     """Reward tracking of linear velocity commands (xy axes) using exponential kernel of specific body."""
     # extract the used quantities (to enable type-hinting)
     asset: RigidObject = env.scene[asset_cfg.name]
-    body_link_idx = asset.find_bodies(body_name)[0][0]
+    body_link_idx = moonshot_utils.find_body_index(asset, body_name)
     body_lin_vel_w = asset.data.body_lin_vel_w[:, body_link_idx, :]
     body_quat_w = asset.data.body_quat_w[:, body_link_idx, :]
-    if body_name == "leg1link2":
-        tf_d_matrix = torch.tensor([[-1,0,0],[0,0,1],[0,1,0]], device = env.device)
-        tf_d_matrix_expanded = tf_d_matrix.unsqueeze(0).expand(env.num_envs, -1, -1)
-        tf_d_quat = math_utils.quat_from_matrix(tf_d_matrix_expanded)
-    elif body_name == "leg1link4":
-        tf_d_matrix = torch.tensor([[0,0,-1],[-1,0,0],[0,1,0]], device = env.device)
-        tf_d_matrix_expanded = tf_d_matrix.unsqueeze(0).expand(env.num_envs, -1, -1)
-        tf_d_quat = math_utils.quat_from_matrix(tf_d_matrix_expanded)
-    else:
-        raise ValueError(f"Unexpected link name: {body_name}")
+    tf_d_quat = _tf_d_quat(body_name, env.device).expand(env.num_envs, -1)
 
     quat_w_d = math_utils.quat_mul(body_quat_w, tf_d_quat)
     
@@ -269,12 +302,7 @@ def track_lin_vel_xy_exp_vehicle(
     )
 
     # compute the error
-    lin_vel_error = torch.sum(
-        torch.square(env.command_manager.get_command(command_name)[:, :2] - body_lin_vel_d[:, :2]),
-        dim=1,
-    )
-    
-    return torch.exp(-lin_vel_error / std**2)
+    return _track_lin_vel_xy_exp(env.command_manager.get_command(command_name), body_lin_vel_d, std)
 
 
 def track_ang_vel_z_exp_vehicle(env: ManagerBasedRLEnv, std: float, command_name: str, body_name: str, asset_cfg: SceneEntityCfg = SceneEntityCfg("robot")
@@ -282,19 +310,17 @@ def track_ang_vel_z_exp_vehicle(env: ManagerBasedRLEnv, std: float, command_name
     """Reward tracking of angular velocity commands (yaw) using exponential kernel."""
     # extract the used quantities (to enable type-hinting)
     asset: RigidObject = env.scene[asset_cfg.name]
-    body_link_idx = asset.find_bodies(body_name)[0][0]
+    body_link_idx = moonshot_utils.find_body_index(asset, body_name)
     body_ang_vel_w = asset.data.body_ang_vel_w[:, body_link_idx, :]
 
     # compute the error
-    ang_vel_error = torch.square(env.command_manager.get_command(command_name)[:, 2] - body_ang_vel_w[:, 2])
-
-    return torch.exp(-ang_vel_error / std**2)
+    return _track_ang_vel_z_exp(env.command_manager.get_command(command_name)[:, 2], body_ang_vel_w[:, 2], std)
 
 def lin_vel_z_body_l2(env: ManagerBasedRLEnv, body_names: list, asset_cfg: SceneEntityCfg = SceneEntityCfg("robot")) -> torch.Tensor:
     """Penalize z-axis base linear velocity using L2 squared kernel."""
     # extract the used quantities (to enable type-hinting)
     asset: Articulation = env.scene[asset_cfg.name]
-    body_link_idx = [asset.find_bodies(name)[0][0] for name in body_names]
+    body_link_idx = [moonshot_utils.find_body_index(asset, name) for name in body_names]
 
     return torch.sum(torch.square(asset.data.body_lin_vel_w[:, body_link_idx, 2]), dim=1)
 
@@ -313,7 +339,7 @@ def joint_torques_vehicle_l2(env: ManagerBasedRLEnv, asset_cfg: SceneEntityCfg =
         "wheel12_right_joint",
     ] 
 
-    wheel_joint_idx = {asset.find_joints(name)[0][0] for name in wheel_joint_names}
+    wheel_joint_idx = {moonshot_utils.find_joint_index(asset, name) for name in wheel_joint_names}
     # if not a wheel joint, then it's a leg joint, which makes it applicable for any number of leg joints
     leg_joint_idx = [idx for idx in all_joint_indices if idx not in wheel_joint_idx]
 
@@ -334,7 +360,7 @@ def joint_torques_dragon_l2(env: ManagerBasedRLEnv, asset_cfg: SceneEntityCfg =
         "wheel14_right_joint",
     ] 
 
-    wheel_joint_idx = {asset.find_joints(name)[0][0] for name in wheel_joint_names}
+    wheel_joint_idx = {moonshot_utils.find_joint_index(asset, name) for name in wheel_joint_names}
     # if not a wheel joint, then it's a leg joint, which makes it applicable for any number of leg joints
     leg_joint_idx = [idx for idx in all_joint_indices if idx not in wheel_joint_idx]
 
@@ -345,7 +371,7 @@ def lin_acc_body_l2(env: ManagerBasedRLEnv, body_name: str, asset_cfg: SceneEnti
     """Penalize linear acceleration of bodies using L2 squared kernel."""
     # extract the used quantities (to enable type-hinting)
     asset: Articulation = env.scene[asset_cfg.name]
-    body_link_idx = asset.find_bodies(body_name)[0][0]
+    body_link_idx = moonshot_utils.find_body_index(asset, body_name)
 
     return torch.sum(torch.square(asset.data.body_lin_acc_w[:, body_link_idx, :]), dim=1)
 
@@ -364,7 +390,7 @@ def body_height_l2(
     """
     # extract the used quantities (to enable type-hinting)
     asset: RigidObject = env.scene[asset_cfg.name]
-    body_link_idx = asset.find_bodies(body_name)[0][0]
+    body_link_idx = moonshot_utils.find_body_index(asset, body_name)
     if sensor_cfg is not None:
         sensor: RayCaster = env.scene[sensor_cfg.name]
         # Adjust the target height using the sensor data
@@ -408,10 +434,10 @@ def body_height_above_wheels_l2(
     """
     # extract the used quantities (to enable type-hinting)
     asset: RigidObject = env.scene[asset_cfg.name]
-    body_link_idx = asset.find_bodies(body_name)[0][0]
+    body_link_idx = moonshot_utils.find_body_index(asset, body_name)
     wheel_joint_names = ["wheel11_left","wheel11_right",
                          "wheel12_left","wheel12_right"] 
-    wheel_joint_idx =  [asset.find_bodies(name)[0][0] for name in wheel_joint_names]
+    wheel_joint_idx =  [moonshot_utils.find_body_index(asset, name) for name in wheel_joint_names]
     wheel_center_height = torch.mean(asset.data.body_pos_w[:, wheel_joint_idx, 2], dim = 1)
     wheel_center_height = wheel_center_height + 0.15
     body_height = asset.data.body_pos_w[:,body_link_idx, 2]
@@ -431,17 +457,17 @@ def upright_wheel_bodies(
 
     # extract the used quantities (to enable type-hinting)
     asset: RigidObject = env.scene[asset_cfg.name]
-    front_body_link_idx = asset.find_bodies("leg1link2")[0][0]
-    rear_body_link_idx = asset.find_bodies("leg1link6")[0][0]
+    front_body_link_idx = moonshot_utils.find_body_index(asset, "leg1link2")
+    rear_body_link_idx = moonshot_utils.find_body_index(asset, "leg1link6")
     wheel_joint_names = ["wheel11_left","wheel11_right",
                          "wheel12_left","wheel12_right"] 
-    front_wheel_joint_idx =  [asset.find_bodies(name)[0][0] for name in wheel_joint_names[:2]]
+    front_wheel_joint_idx =  [moonshot_utils.find_body_index(asset, name) for name in wheel_joint_names[:2]]
     front_wheel_center_height = torch.mean(asset.data.body_pos_w[:, front_wheel_joint_idx, 2], dim = 1)
     front_body_height = asset.data.body_pos_w[:,front_body_link_idx, 2]
     front_height_diff = front_body_height - front_wheel_center_height
     front_deviation = front_height_diff - target_height
     
-    rear_wheel_joint_idx =  [asset.find_bodies(name)[0][0] for name in wheel_joint_names[2:]]    
+    rear_wheel_joint_idx =  [moonshot_utils.find_body_index(asset, name) for name in wheel_joint_names[2:]]    
     rear_wheel_center_height = torch.mean(asset.data.body_pos_w[:, rear_wheel_joint_idx, 2], dim = 1)    
     rear_body_height = asset.data.body_pos_w[:,rear_body_link_idx, 2]
     rear_height_diff = rear_body_height - rear_wheel_center_height
@@ -460,11 +486,11 @@ def upright_wheel_bodies_angle(
 
     # extract the used quantities (to enable type-hinting)
     asset: RigidObject = env.scene[asset_cfg.name]
-    front_body_link_idx = asset.find_bodies("leg1link2")[0][0]
-    rear_body_link_idx = asset.find_bodies("leg1link6")[0][0]
+    front_body_link_idx = moonshot_utils.find_body_index(asset, "leg1link2")
+    rear_body_link_idx = moonshot_utils.find_body_index(asset, "leg1link6")
     wheel_joint_names = ["wheel11_left","wheel11_right",
                          "wheel12_left","wheel12_right"] 
-    front_wheel_joint_idx =  [asset.find_bodies(name)[0][0] for name in wheel_joint_names[:2]]
+    front_wheel_joint_idx =  [moonshot_utils.find_body_index(asset, name) for name in wheel_joint_names[:2]]
     front_wheel_center = torch.mean(asset.data.body_pos_w[:, front_wheel_joint_idx, :], dim = 1)
     front_body = asset.data.body_pos_w[:,front_body_link_idx, :]
     front_diff = front_body - front_wheel_center
@@ -475,7 +501,7 @@ def upright_wheel_bodies_angle(
     front_z = front_diff_normalized[:, 2]
     front_angles = torch.acos(torch.clamp(front_z, -1.0, 1.0))
     
-    rear_wheel_joint_idx =  [asset.find_bodies(name)[0][0] for name in wheel_joint_names[2:]]    
+    rear_wheel_joint_idx =  [moonshot_utils.find_body_index(asset, name) for name in wheel_joint_names[2:]]    
     rear_wheel_center = torch.mean(asset.data.body_pos_w[:, rear_wheel_joint_idx, :], dim = 1)
     rear_body = asset.data.body_pos_w[:,rear_body_link_idx, :]
     rear_diff = rear_body - rear_wheel_center
@@ -7,6 +7,8 @@ from isaaclab.assets import Articulation, RigidObject
 from isaaclab.managers import SceneEntityCfg
 import isaaclab.utils.math as math_utils
 
+import isaaclab_tasks.manager_based.moonshot.utils as moonshot_utils
+
 if TYPE_CHECKING:
     from isaaclab.envs import ManagerBasedRLEnv
 
@@ -41,6 +43,6 @@ def joint_vel_out_of_manual_limit_vehicle(
     # extract the used quantities (to enable type-hinting)
     asset: Articulation = env.scene[asset_cfg.name]
     body_joint_names = ["leg1joint[1-7]"] 
-    body_joint_idx =  [asset.find_joints(name)[0][0] for name in body_joint_names]
+    body_joint_idx =  [moonshot_utils.find_joint_index(asset, name) for name in body_joint_names]
     # compute any violations
     return torch.any(torch.abs(asset.data.joint_vel[:, body_joint_idx]) > max_velocity, dim=1)
\ No newline at end of file
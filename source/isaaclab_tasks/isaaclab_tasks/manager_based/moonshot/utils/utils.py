@@ -2,13 +2,18 @@
 
 from typing import List
 
+import functools
 import re
 import os
 
+@functools.lru_cache(maxsize=None)
 def find_isaaclab_path(start_path: str = __file__) -> str:
     """
     Finds the full path of the 'IsaacLab' directory by traversing upwards from the start_path.
-    
+
+    The result is cached per start path, so repeated calls (e.g. from several config modules)
+    only walk the directory hierarchy once.
+
     Args:
         start_path (str): The path to start searching from. Defaults to the current file's location.
     
@@ -26,6 +31,54 @@ def find_isaaclab_path(start_path: str = __file__) -> str:
     
     raise FileNotFoundError("Could not find 'IsaacLab' directory in the parent hierarchy.")
 
+def find_body_index(asset, body_name: str) -> int:
+    """
+    Resolves a body name to its index on the articulation, caching the result.
+
+    The regex-based ``find_bodies`` lookup is too slow to run inside per-step reward or
+    observation terms, so the resolved index is cached on the asset instance (a new asset
+    gets a fresh cache automatically).
+
+    Args:
+        asset: The articulation or rigid object to resolve the name on.
+        body_name (str): The name of the body.
+
+    Returns:
+        int: The index of the first matching body.
+    """
+    cache = getattr(asset, "_moonshot_body_indices", None)
+    if cache is None:
+        cache = {}
+        asset._moonshot_body_indices = cache
+    index = cache.get(body_name)
+    if index is None:
+        index = asset.find_bodies(body_name)[0][0]
+        cache[body_name] = index
+    return index
+
+def find_joint_index(asset, joint_name: str) -> int:
+    """
+    Resolves a joint name to its index on the articulation, caching the result.
+
+    Counterpart of :func:`find_body_index` for joints.
+
+    Args:
+        asset: The articulation to resolve the name on.
+        joint_name (str): The name of the joint.
+
+    Returns:
+        int: The index of the first matching joint.
+    """
+    cache = getattr(asset, "_moonshot_joint_indices", None)
+    if cache is None:
+        cache = {}
+        asset._moonshot_joint_indices = cache
+    index = cache.get(joint_name)
+    if index is None:
+        index = asset.find_joints(joint_name)[0][0]
+        cache[joint_name] = index
+    return index
+
 def sort_wheel_joints(joint_list: List[str]) -> List[str]:
     """
     Sorts wheel joints in ascending numerical order, ensuring left joints appear before right joints.